@@ -1,15 +1,36 @@
 from __future__ import annotations
 
+import importlib
 import importlib.metadata
+from typing import TYPE_CHECKING, Final
 
-from contact_messenger_bot.api import constants, oauth2, services
+if TYPE_CHECKING:
+    from types import ModuleType
 
-# set the version number within the package using importlib
-try:
-    __version__: str | None = importlib.metadata.version("contact-messenger-bot-api")
-except importlib.metadata.PackageNotFoundError:
-    # package is not installed
-    __version__ = None
+    from contact_messenger_bot.api import constants, oauth2, services
+
+# submodules are imported on first access so that light-weight consumers do not pay for the Google API imports
+_SUBMODULES: Final[frozenset[str]] = frozenset(["constants", "oauth2", "services"])
+
+
+def __getattr__(name: str) -> ModuleType | str | None:
+    if name in _SUBMODULES:
+        module = importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+
+    if name == "__version__":
+        # set the version number within the package using importlib (deferred until first accessed)
+        try:
+            version: str | None = importlib.metadata.version("contact-messenger-bot-api")
+        except importlib.metadata.PackageNotFoundError:
+            # package is not installed
+            version = None
+        globals()["__version__"] = version
+        return version
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
 
 
 __all__ = ["__version__", "constants", "oauth2", "services"]
@@ -1,4 +1,3 @@
-import datetime
 from typing import Final
 
 MAX_RETRY: Final[int] = 2
@@ -8,12 +7,13 @@ PHONE_LABEL: Final[str] = "phone"
 MOBILE_LABEL: Final[str] = "mobile"
 BOT_LABEL: Final[str] = "bot"
 
-TODAY: Final[datetime.date] = datetime.datetime.now(tz=datetime.UTC).date()
+TRUTHY: Final[tuple[str, ...]] = ("1", "true", "True", "TRUE")  # common spellings first to skip casefolding
 
-TRUTHY: Final[frozenset[str]] = frozenset(["true", "1"])
+# Small label collections are tuples ordered by how often they are expected to match.
+EMAIL_ADDRESS_LABELS: Final[tuple[str, ...]] = (HOME_LABEL, MOBILE_LABEL, PHONE_LABEL, BOT_LABEL)
 
-EMAIL_ADDRESS_LABELS: Final[frozenset[str]] = frozenset([HOME_LABEL, MOBILE_LABEL, PHONE_LABEL, BOT_LABEL])
+MOBILE_LABELS: Final[tuple[str, ...]] = (MOBILE_LABEL, PHONE_LABEL)
 
-MOBILE_LABELS: Final[frozenset[str]] = frozenset([MOBILE_LABEL, PHONE_LABEL])
+PHONE_NUMBER_LABELS: Final[tuple[str, ...]] = (MOBILE_LABEL, BOT_LABEL)
 
 APP_NAME: Final[str] = "contact-message-bot"
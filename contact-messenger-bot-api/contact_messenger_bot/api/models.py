@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import random
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, fields
 from enum import Enum, EnumMeta, IntEnum, auto, unique
-from functools import cache
+from functools import cache, cached_property
 from typing import TYPE_CHECKING, Any, Final, NamedTuple, cast
 
 from contact_messenger_bot.api import utils
@@ -18,21 +19,24 @@ _RANDOM: Final[random.Random] = random.Random()  # noqa: S311
 
 class _CaseInsensitiveEnumMeta(EnumMeta):
     def __call__(cls, value: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
-        try:
-            return super().__call__(value, *args, **kwargs)
-        except ValueError:
-            items = cast("Iterable[Enum]", cls)
-            for item in items:
-                if item.name.casefold() == value.casefold():
-                    return cast("type[Enum]", item)
-            raise
+        if isinstance(value, str) and not args and not kwargs:
+            item = _get_casefold_members(cls).get(value.casefold())
+            if item is not None:
+                return cast("type[Enum]", item)
+        return super().__call__(value, *args, **kwargs)
+
+
+@cache
+def _get_casefold_members(cls: EnumMeta) -> dict[str, Enum]:
+    items = cast("Iterable[Enum]", cls)
+    return {item.name.casefold(): item for item in items}
 
 
 @unique
 class Country(str, Enum, metaclass=_CaseInsensitiveEnumMeta):
     US = "US"
 
-    def __repr__(self) -> str:
+    def __str__(self) -> str:
         return self.name
 
 
@@ -41,10 +45,15 @@ class CustomFields(str, Enum):
     BOT_SALUATION = "BOT_SALUATION"
     BOT_OPT_OUT = "BOT_OPT_OUT"
 
-    def __repr__(self) -> str:
+    def __str__(self) -> str:
         return self.name
 
 
+# Plain string keys for the contact metadata lookups (avoids resolving the enum member on each access).
+_BOT_SALUATION_KEY: Final[str] = CustomFields.BOT_SALUATION.value
+_BOT_OPT_OUT_KEY: Final[str] = CustomFields.BOT_OPT_OUT.value
+
+
 @unique
 class SortOrder(str, Enum, metaclass=_CaseInsensitiveEnumMeta):
     LAST_MODIFIED_ASCENDING = "LAST_MODIFIED_ASCENDING"  # Sort people by when they were changed; older entries first.
@@ -57,37 +66,35 @@ class DateType(IntEnum):
     BIRTHDAY = auto()
     ANNIVERSARY = auto()
 
-    def __repr__(self) -> str:
+    def __str__(self) -> str:
         return self.name
 
     def subject(self, given_name: str) -> str:
-        if self == self.BIRTHDAY:
-            return self._message_fmt(birthday.SUBJECTS).format(GIVEN_NAME=given_name)
-        if self == self.ANNIVERSARY:
-            return self._message_fmt(anniversary.SUBJECTS).format(GIVEN_NAME=given_name)
-
-        raise NotImplementedError
+        return _RANDOM.choice(_SUBJECTS[self]).format(GIVEN_NAME=given_name)
 
     def message(self, given_name: str) -> str:
-        if self == self.BIRTHDAY:
-            return self._message_fmt(birthday.MESSAGES).format(GIVEN_NAME=given_name)
-        if self == self.ANNIVERSARY:
-            return self._message_fmt(anniversary.MESSAGES).format(GIVEN_NAME=given_name)
+        return _RANDOM.choice(_MESSAGES[self]).format(GIVEN_NAME=given_name)
 
-        raise NotImplementedError
 
-    @staticmethod
-    def _message_fmt(mesages: list[str]) -> str:
-        idx = int(_RANDOM.uniform(0, len(mesages)))
-        return mesages[idx]
+_SUBJECTS: Final[dict[DateType, tuple[str, ...]]] = {
+    DateType.BIRTHDAY: tuple(birthday.SUBJECTS),
+    DateType.ANNIVERSARY: tuple(anniversary.SUBJECTS),
+}
 
+_MESSAGES: Final[dict[DateType, tuple[str, ...]]] = {
+    DateType.BIRTHDAY: tuple(birthday.MESSAGES),
+    DateType.ANNIVERSARY: tuple(anniversary.MESSAGES),
+}
 
-class Coordinate(NamedTuple):
+
+@dataclass(frozen=True, slots=True)
+class Coordinate:
     latitude: float
     longitude: float
 
 
-class DateTuple(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class DateTuple:
     type: DateType
     date: datetime.date
 
@@ -99,12 +106,14 @@ class DateTuple(NamedTuple):
         return test.month == self.date.month and test.day == self.date.day
 
 
-class Address(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class Address:
     postal_code: str
     tz: datetime.tzinfo | None
 
 
-class Contact(NamedTuple):
+@dataclass(frozen=True)
+class Contact:
     given_name: str
     display_name: str
     nickname: str | None
@@ -118,32 +127,42 @@ class Contact(NamedTuple):
     def __repr__(self) -> str:
         return self.display_name
 
+    def __getstate__(self) -> dict[str, Any]:
+        # Leave the cached_property values out of pickles (the contacts cache); they are rebuilt on demand.
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
     def can_notify_today(self, test: datetime.date) -> bool:
         """Determines whether this Contact has notifications today."""
         return any(dt.is_today(test) for dt in self.dates)
 
     def is_member(self, groups: frozenset[str]) -> bool:
         """Determines if this Contact is a member of one of the specified groups."""
-        return bool(groups.intersection(g.casefold() for g in self.groups))
+        return not groups.isdisjoint(self._casefold_groups)
+
+    @cached_property
+    def _casefold_groups(self) -> frozenset[str]:
+        return frozenset(g.casefold() for g in self.groups)
 
     @property
     def saluation(self) -> str:
         """Gets the saluation in sending messages."""
-        return self.metadata.get(CustomFields.BOT_SALUATION) or self.nickname or self.given_name
+        return self.metadata.get(_BOT_SALUATION_KEY) or self.nickname or self.given_name
 
-    @property
+    @cached_property
     def opt_out_messages(self) -> bool:
         """Gets a value indicating whether this contact has opt out to receiving messages."""
-        return utils.is_truthy(self.metadata.get(CustomFields.BOT_OPT_OUT))
+        return utils.is_truthy(self.metadata.get(_BOT_OPT_OUT_KEY))
 
     def get_primary_mobile_email_address(self) -> EmailAddress | None:
-        mobile_email_addresses = [n for n in self.email_addresses if n.is_phone]
-        if not mobile_email_addresses:
-            return None
-        primary_mobile_email_address = next((n for n in mobile_email_addresses if n.is_primary), None)
-        if primary_mobile_email_address:
-            return primary_mobile_email_address
-        return mobile_email_addresses[0]
+        first_mobile_email_address: EmailAddress | None = None
+        for n in self.email_addresses:
+            if not n.is_phone:
+                continue
+            if n.is_primary:
+                return n
+            if first_mobile_email_address is None:
+                first_mobile_email_address = n
+        return first_mobile_email_address
 
     def get_primary_email_address(self) -> EmailAddress | None:
         """Gets the email address associated with the contact's phone number."""
@@ -154,39 +173,67 @@ class Contact(NamedTuple):
 
     def get_us_mobile_number(self) -> PhoneNumber | None:
         """Gets the mobile number that can receive SMS messages."""
-        us_mobile_numbers = [n for n in self.mobile_numbers if n.country() == Country.US]
-        bot_mobile_number = next((n for n in us_mobile_numbers if n.is_bot), None)
-        if bot_mobile_number:
-            return bot_mobile_number
-        primary_mobile_number = next((n for n in us_mobile_numbers if n.is_primary), None)
-        if primary_mobile_number:
-            return primary_mobile_number
-        return next(iter(us_mobile_numbers), None)
+        primary_mobile_number: PhoneNumber | None = None
+        first_mobile_number: PhoneNumber | None = None
+        for n in self.mobile_numbers:
+            if n.country() != Country.US:
+                continue
+            if n.is_bot:
+                return n
+            if primary_mobile_number is None and n.is_primary:
+                primary_mobile_number = n
+            if first_mobile_number is None:
+                first_mobile_number = n
+        return primary_mobile_number or first_mobile_number
 
     def get_all_mobile_email_addresses(self) -> list[EmailAddress]:
         """Gets the possible email addresses for the phone carriers that match the mobile number associated."""
-        mobile_email_addresses = [(n, n.get_email_addresses()) for n in self.mobile_numbers]
-        if not mobile_email_addresses:
+        if not self.mobile_numbers:
             return []
 
-        bot_mobile_email_addresses = next((ea for n, ea in mobile_email_addresses if n.is_bot), None)
-        if bot_mobile_email_addresses:
-            return bot_mobile_email_addresses
+        # Only the email addresses of the selected number are generated.
+        bot_mobile_number: PhoneNumber | None = None
+        primary_mobile_number: PhoneNumber | None = None
+        for n in self.mobile_numbers:
+            if bot_mobile_number is None and n.is_bot:
+                bot_mobile_number = n
+            if primary_mobile_number is None and n.is_primary:
+                primary_mobile_number = n
+            if bot_mobile_number is not None and primary_mobile_number is not None:
+                break
 
-        primary_email_addresses = next((ea for n, ea in mobile_email_addresses if n.is_primary), None)
-        if primary_email_addresses:
-            return primary_email_addresses
+        for mobile_number in (bot_mobile_number, primary_mobile_number):
+            if mobile_number is not None:
+                email_addresses = mobile_number.get_email_addresses()
+                if email_addresses:
+                    return email_addresses
 
-        return mobile_email_addresses[0][1]
+        return self.mobile_numbers[0].get_email_addresses()
 
 
-class Profile(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class Profile:
     given_name: str
     display_name: str
     mobile_number: PhoneNumber
     email_address: EmailAddress
 
 
+class ContactDirectory:
+    """Indexes contacts by the (month, day) of their dates."""
+
+    def __init__(self, contacts: Iterable[Contact]) -> None:
+        self._contacts_by_month_day: dict[tuple[int, int], list[Contact]] = {}
+        for contact in contacts:
+            # A contact with several events on the same day is only indexed once for that day.
+            for month_day in {(dt.date.month, dt.date.day) for dt in contact.dates}:
+                self._contacts_by_month_day.setdefault(month_day, []).append(contact)
+
+    def get_contacts_on(self, date: datetime.date) -> tuple[Contact, ...]:
+        """Gets the contacts that have a date on the same month and day."""
+        return tuple(self._contacts_by_month_day.get((date.month, date.day), ()))
+
+
 class ContactGroup(NamedTuple):
     name: str
     members: frozenset[str]
@@ -195,7 +242,8 @@ class ContactGroup(NamedTuple):
         return self.name
 
 
-class PhoneNumber(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class PhoneNumber:
     number: str
     is_primary: bool
     is_bot: bool = False
@@ -206,13 +254,18 @@ class PhoneNumber(NamedTuple):
 
     def shortnumber(self) -> str:
         """Gets the short representation of the phone number."""
-        if self.country() == Country.US:
-            return self.number.replace("-", "")[-10:]
-        return self.number
+        if not utils.is_us_phone_number(self.number):
+            return self.number
+        return (self.number.replace("-", "") if "-" in self.number else self.number)[-10:]
 
     def get_email_addresses(self) -> list[EmailAddress]:
         """Gets the list of email addresses associated with phone carriers in the same Country as the number."""
-        addresses = (carrier.get_email(self) for carrier in MobileCarrier.get_carriers() if carrier.enabled)
+        country = self.country()
+        if country is None:
+            return []
+
+        carriers = _ENABLED_CARRIERS_BY_COUNTRY.get(country, ())
+        addresses = (carrier.get_email(self) for carrier in carriers)
         return [
             EmailAddress(address, is_primary=self.is_primary, is_phone=True, is_bot=self.is_bot)
             for address in addresses
@@ -220,7 +273,8 @@ class PhoneNumber(NamedTuple):
         ]
 
 
-class EmailAddress(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class EmailAddress:
     address: str
     is_primary: bool
     is_phone: bool
@@ -228,18 +282,20 @@ class EmailAddress(NamedTuple):
 
     def get_mobile_carrier(self) -> MobileCarrier | None:
         """Gets the mobile carrier associated with this email address."""
-        for carrier in MobileCarrier.get_carriers():
-            if carrier.is_carrier(self.address):
-                return carrier
-        return None
+        return _get_mobile_carrier(self.address)
 
     def is_enabled(self) -> bool:
         """Indicates whether this email address is enabled."""
-        if self.is_phone:
-            carrier = self.get_mobile_carrier()
-            if carrier:
-                return carrier.enabled
-        return True
+        if not self.is_phone:
+            return True
+        carrier = _get_mobile_carrier(self.address)
+        return carrier.enabled if carrier else True
+
+
+def _get_mobile_carrier(address: str) -> MobileCarrier | None:
+    if not address.endswith(_CARRIER_EMAIL_SUFFIXES):
+        return None
+    return _CARRIERS_BY_DOMAIN.get(address.rpartition("@")[2])
 
 
 class MobileCarrier(ABC):
@@ -251,9 +307,6 @@ class MobileCarrier(ABC):
         """Indicates whether this carrier is enabled."""
         return True
 
-    def is_carrier(self, address: str) -> bool:
-        return False
-
     @property
     @abstractmethod
     def country(self) -> Country:
@@ -263,11 +316,6 @@ class MobileCarrier(ABC):
     def get_email(self, number: PhoneNumber) -> str | None:
         pass
 
-    @staticmethod
-    @cache
-    def get_carriers() -> list[MobileCarrier]:
-        return [x() for x in utils.get_all_subclasses(MobileCarrier)]
-
 
 class USMobileCarrier(MobileCarrier):
     @property
@@ -279,12 +327,14 @@ class USMobileCarrier(MobileCarrier):
     def domain(self) -> str:
         pass
 
-    def is_carrier(self, address: str) -> bool:
-        return address.endswith(f"@{self.domain}")
+    @cached_property
+    def email_suffix(self) -> str:
+        """The suffix of this carrier's email addresses."""
+        return f"@{self.domain}"
 
     def get_email(self, number: PhoneNumber) -> str | None:
         if number.country() == self.country:
-            return f"{number.shortnumber()}@{self.domain}"
+            return number.shortnumber() + self.email_suffix
         return None
 
 
@@ -307,3 +357,18 @@ class TMobile(USMobileCarrier):
 
 class Verison(USMobileCarrier):
     domain: Final[str] = "vtext.com"
+
+
+_CARRIERS: Final[tuple[MobileCarrier, ...]] = (ATT(), GoogleFi(), TMobile(), Verison())
+
+_ENABLED_CARRIERS_BY_COUNTRY: Final[dict[Country, tuple[MobileCarrier, ...]]] = {
+    country: tuple(c for c in _CARRIERS if c.enabled and c.country == country) for country in Country
+}
+
+_CARRIERS_BY_DOMAIN: Final[dict[str, MobileCarrier]] = {
+    c.domain: c for c in _CARRIERS if isinstance(c, USMobileCarrier)
+}
+
+_CARRIER_EMAIL_SUFFIXES: Final[tuple[str, ...]] = tuple(
+    c.email_suffix for c in _CARRIERS if isinstance(c, USMobileCarrier)
+)
@@ -1,8 +1,10 @@
+from __future__ import annotations
+
 import contextlib
-from functools import wraps
-from os import PathLike
+import json
+from functools import cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Final
+from typing import TYPE_CHECKING, Any
 
 import structlog
 from google.auth.exceptions import RefreshError
@@ -14,16 +16,23 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 from contact_messenger_bot.api import constants
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Mapping
+    from os import PathLike
 
 logger = structlog.get_logger(__name__)
 
 
+@cache
+def _get_request() -> Request:
+    """Gets the shared transport Request used to refresh credentials."""
+    return Request()
+
+
 class CredentialsManager:
     def __init__(self, creds_file: PathLike, token_file: PathLike) -> None:
         self._creds_file = Path(creds_file)
         self._token_file = Path(token_file)
-        self.__token_file_ctime = self._token_file.stat().st_ctime if self._token_file.exists() else None
+        self.__token_file_ctime = self._get_token_file_ctime()
 
     @property
     def creds_file(self) -> Path:
@@ -38,16 +47,22 @@ class CredentialsManager:
 
     def invalidate_token(self) -> bool:
         """Invalidates the token"""
-        if self._token_file.exists():
-            logger.info("Removing token", file=str(self._token_file))
+        try:
             self._token_file.unlink()
-            return True
-        return False
+        except FileNotFoundError:
+            return False
+        logger.info("Removed token", file=str(self._token_file))
+        return True
 
     def is_token_changed(self) -> bool:
         """Determines if the token has changed."""
-        token_file_ctime = self._token_file.stat().st_ctime if self._token_file.exists() else None
-        return token_file_ctime != self.__token_file_ctime
+        return self._get_token_file_ctime() != self.__token_file_ctime
+
+    def _get_token_file_ctime(self) -> float | None:
+        try:
+            return self._token_file.stat().st_ctime
+        except FileNotFoundError:
+            return None
 
     @retry(
         retry=retry_if_exception_type(RefreshError),
@@ -57,37 +72,45 @@ class CredentialsManager:
     def create_oauth_credentials(self, scopes: list[str]) -> Credentials:
         """Creates an instance of OAuth 2.0 Credentials"""
         creds = None
-        if self._token_file.exists():
-            with contextlib.suppress(ValueError):
-                logger.info("Authenticating with token", file=str(self._token_file))
-                creds = self._wrap_creds(Credentials.from_authorized_user_file(str(self._token_file), scopes))
+        with contextlib.suppress(FileNotFoundError, ValueError):
+            creds = self._wrap_creds(json.loads(self._token_file.read_text()), scopes)
+            logger.info("Authenticating with token", file=str(self._token_file))
 
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 logger.info("Refreshing credentials")
-                creds.refresh(Request())
+                creds.refresh(_get_request())
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(str(self._creds_file), scopes)
-                creds = self._wrap_creds(flow.run_local_server(port=0), save=True)
+                creds = self._wrap_creds(json.loads(flow.run_local_server(port=0).to_json()), scopes, save=True)
 
         return creds
 
-    def _wrap_creds(self, creds: Credentials, save: bool = False) -> Credentials:
-        refresh_orig: Final[Callable[[Request], None]] = creds.refresh
-
-        def save_token() -> None:
-            logger.info("Saving token", file=str(self._token_file))
-            self.write_token(creds.to_json())
-
-        @wraps(creds.refresh)
-        def refresh(request: Request) -> None:
-            self.invalidate_token()
-            refresh_orig(request)
-            save_token()
+    def save_token(self, creds: Credentials) -> None:
+        logger.info("Saving token", file=str(self._token_file))
+        self.write_token(creds.to_json())
 
-        creds.refresh = refresh
+    def _wrap_creds(self, info: Mapping[str, Any], scopes: list[str], save: bool = False) -> Credentials:
+        creds = _TokenSavingCredentials.from_authorized_user_info(info, scopes)
+        creds.manager = self
 
         if save:
-            save_token()
+            self.save_token(creds)
 
         return creds
+
+
+class _TokenSavingCredentials(Credentials):
+    """Credentials that persist the token whenever they are refreshed."""
+
+    # Copies made by with_scopes() and friends are built without a manager, so they refresh without saving.
+    manager: CredentialsManager | None = None
+
+    def refresh(self, request: Request) -> None:
+        if self.manager is None:
+            super().refresh(request)
+            return
+
+        self.manager.invalidate_token()
+        super().refresh(request)
+        self.manager.save_token(self)
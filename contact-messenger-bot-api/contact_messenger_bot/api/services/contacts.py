@@ -1,24 +1,39 @@
 from __future__ import annotations
 
 import datetime
+import logging
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
 from http import HTTPStatus
 from pathlib import Path
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any, Final, cast
 
 import google.auth.exceptions
 import structlog
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import Resource, build
 from googleapiclient.errors import HttpError
-from tenacity import retry, retry_if_exception_cause_type, retry_if_exception_type, stop_after_attempt, wait_exponential
+from googleapiclient.http import build_http
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    retry_if_exception_cause_type,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
 from contact_messenger_bot.api import constants, models, utils
 
 if TYPE_CHECKING:
     import os
-    from collections.abc import Callable, Iterable
+    from collections.abc import Callable, Iterable, Iterator, Mapping
 
+    from google.oauth2.credentials import Credentials
     from googleapiclient.http import HttpRequest
 
     from contact_messenger_bot.api import oauth2
@@ -27,6 +42,34 @@ if TYPE_CHECKING:
 
 logger = structlog.get_logger(__name__)
 
+_EMPTY: Final[Mapping[str, Any]] = MappingProxyType({})  # shared read-only default for missing sub-objects
+
+_THROTTLED_STATUSES: Final[frozenset[int]] = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+_MAX_RETRY_AFTER: Final[float] = 60.0
+_BACKOFF: Final = wait_exponential()
+
+
+def _is_throttled(e: BaseException) -> bool:
+    return isinstance(e, HttpError) and e.status_code in _THROTTLED_STATUSES
+
+
+def _wait_for_server(retry_state: RetryCallState) -> float:
+    """Waits as long as the server asked (Retry-After) when throttled, otherwise backs off exponentially."""
+    e = retry_state.outcome.exception() if retry_state.outcome is not None else None
+    if isinstance(e, HttpError):
+        retry_after = e.resp.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), _MAX_RETRY_AFTER)
+    return _BACKOFF(retry_state)
+
 
 class Contacts:
     SCOPES: Final[list[str]] = [
@@ -40,9 +83,26 @@ class Contacts:
         "names,emailAddresses,phoneNumbers"  # see https://developers.google.com/people/api/rest/v1/people
     )
     PEOPLE_API_RESOURCE: Final[str] = "people/me"
-    MAX_PAGE_SIZE: Final[int] = 100
+    MAX_PAGE_SIZE: Final[int] = 1000  # the maximum page size allowed by the People API
+    SORT_ORDER: Final[str] = models.SortOrder.FIRST_NAME_ASCENDING.value
     BUILT_IN_GROUPS: Final[tuple[str, ...]] = ("all", "mycontacts")
     GROUP_FIELDS: Final[str] = "name,memberCount"
+    MAX_BATCH_SIZE: Final[int] = 200  # the maximum number of groups per contactGroups.batchGet call
+    # Partial response masks: only the parts of each response that are parsed are returned.
+    CONTACT_RESPONSE_FIELDS: Final[str] = (
+        "nextPageToken,connections(resourceName,names(givenName,displayName),nicknames(value,metadata(primary)),"
+        "emailAddresses(value,type,metadata(primary)),phoneNumbers(value,canonicalForm,type,metadata(primary)),"
+        "birthdays(date,metadata(primary)),events(date,type),userDefined(key,value),addresses(postalCode,type))"
+    )
+    PROFILE_RESPONSE_FIELDS: Final[str] = (
+        "names(givenName,displayName),emailAddresses(value,type,metadata(primary)),"
+        "phoneNumbers(value,canonicalForm,type,metadata(primary))"
+    )
+    GROUP_RESPONSE_FIELDS: Final[str] = "nextPageToken,contactGroups(resourceName,name,memberCount)"
+    GROUP_MEMBERS_RESPONSE_FIELDS: Final[str] = (
+        "responses(requestedResourceName,status,contactGroup(memberResourceNames))"
+    )
+    CACHE_VERSION: Final[int] = 2  # bump whenever the pickled models change shape
 
     def __init__(self, creds: oauth2.CredentialsManager, zipcode: ZipCode, cache: os.PathLike | None = None) -> None:
         self.creds = creds
@@ -52,19 +112,22 @@ class Contacts:
 
     def get_contacts(
         self, groups: Iterable[str] | None = None, load_cache: bool = True, save_cache: bool = True
-    ) -> Iterable[models.Contact]:
+    ) -> list[models.Contact]:
         groups = utils.to_frozen_set(groups)
         if load_cache and self.cache is not None and self.cache.exists():
             contacts = self._get_cache()[1]
             if contacts is not None:
                 if groups:
                     gcontacts = [c for c in contacts if c.is_member(groups)]
-                    logger.debug("Filter applied", groups=sorted(groups), length=len(contacts), filtered=len(gcontacts))
+                    if logger.is_enabled_for(logging.DEBUG):
+                        logger.debug(
+                            "Filter applied", groups=sorted(groups), length=len(contacts), filtered=len(gcontacts)
+                        )
                     return gcontacts
 
                 return contacts
 
-        contacts = list(self._get_contacts(groups))
+        contacts = self._get_contacts(groups)
         if save_cache and groups is None and self.cache is not None:
             self._save_cache(contacts=contacts)
         return contacts
@@ -92,7 +155,7 @@ class Contacts:
         profile = self._query_profile(self.PROFILE_FIELDS)
         profile_name = self._get_name(profile)
         assert profile_name is not None
-        mobile_number = next(filter(lambda x: x.is_primary, self._get_mobile_numbers(profile)))
+        mobile_number = next(filter(lambda x: x.is_primary, self._get_mobile_numbers(profile, profile_name[1])))
         email_address = next(filter(lambda x: x.is_primary, self._get_email_addresses(profile)))
         return models.Profile(profile_name[0], profile_name[1], mobile_number, email_address)
 
@@ -101,12 +164,23 @@ class Contacts:
         wait=wait_exponential(),
         stop=stop_after_attempt(constants.MAX_RETRY),
     )
-    def _get_contacts(self, interested_groups: frozenset[str] | None = None) -> Iterable[models.Contact]:
+    def _get_contacts(self, interested_groups: frozenset[str] | None = None) -> list[models.Contact]:
+        # Materialize inside the retry, so a RefreshError raised while paging is actually retried.
+        return list(self._iter_contacts(interested_groups))
+
+    def _iter_contacts(self, interested_groups: frozenset[str] | None) -> Iterator[models.Contact]:
         groups = self._query_groups(interested_groups)
         contacts = self._query_contacts(self.CONTACT_FIELDS)
+        debug_enabled = logger.is_enabled_for(logging.DEBUG)
+        default_year = utils.get_today().year
+
+        group_names_by_member: dict[str, list[str]] = {}
+        for group in groups:  # groups are sorted, so each member's group names are too
+            for member in group.members:
+                group_names_by_member.setdefault(member, []).append(group.name)
+
         for contact in contacts:
-            resource_name = contact["resourceName"]
-            membership = [g.name for g in groups if resource_name in g.members]
+            membership = group_names_by_member.get(contact["resourceName"], [])
             if interested_groups is not None and not membership:
                 continue  # This contact is not a member of any of the Groups.
 
@@ -116,14 +190,16 @@ class Contacts:
 
             given_name, display_name = name
 
-            logger.debug("Processing", contact=display_name)
+            if debug_enabled:
+                logger.debug("Processing", contact=display_name)
 
             nickname = self._get_nickname(contact)
             home_addresses = self._get_home_addresses(contact)
-            mobile_numbers = self._get_mobile_numbers(contact)
+            mobile_numbers = self._get_mobile_numbers(contact, display_name)
             email_addresses = self._get_email_addresses(contact)
-            dates = self._get_dates(contact)
-            metadata = {ud["key"]: ud["value"] for ud in contact["userDefined"]} if "userDefined" in contact else {}
+            dates = self._get_dates(contact, default_year)
+            user_defined = contact.get("userDefined")
+            metadata = {ud["key"]: ud["value"] for ud in user_defined} if user_defined else {}
             yield models.Contact(
                 given_name,
                 display_name,
@@ -144,25 +220,36 @@ class Contacts:
     def _get_groups(self, interested_groups: frozenset[str] | None) -> list[models.ContactGroup]:
         return self._query_groups(interested_groups)
 
+    @cached_property
+    def _credentials(self) -> Credentials:
+        return self.creds.create_oauth_credentials(self.SCOPES)
+
+    @cached_property
+    def _http(self) -> AuthorizedHttp:
+        return AuthorizedHttp(self._credentials, http=build_http())
+
     @cached_property
     @retry(
         retry=retry_if_exception_type(AttributeError),
-        wait=wait_exponential(),
+        wait=wait_exponential(multiplier=0.5) + wait_random(0, 0.5),
         stop=stop_after_attempt(constants.MAX_RETRY),
     )
     def _resource(self) -> Resource:
         logger.debug("Creating Resource")
-        credentials = self.creds.create_oauth_credentials(self.SCOPES)
-        return build("people", "v1", credentials=credentials, cache_discovery=False)
+        return build("people", "v1", http=self._http, cache_discovery=False)
 
     def _reset_resource(self) -> None:
         logger.debug("Resetting resource.")
         self.__dict__.pop("_resource", None)
+        self.__dict__.pop("_http", None)
+        self.__dict__.pop("_credentials", None)
         self.creds.invalidate_token()
 
     def _query_profile(self, fields: str) -> dict[str, Any]:
         return self._execute_with_retry(
-            lambda resource: resource.people().get(resourceName=self.PEOPLE_API_RESOURCE, personFields=fields)
+            lambda resource: resource.people().get(
+                resourceName=self.PEOPLE_API_RESOURCE, personFields=fields, fields=self.PROFILE_RESPONSE_FIELDS
+            )
         )
 
     def _query_contacts(self, fields: str) -> Iterable[dict[str, Any]]:
@@ -172,49 +259,79 @@ class Contacts:
             resourceName=self.PEOPLE_API_RESOURCE,
             pageSize=self.MAX_PAGE_SIZE,
             personFields=fields,
-            sortOrder=models.SortOrder.FIRST_NAME_ASCENDING.value,
+            fields=self.CONTACT_RESPONSE_FIELDS,
+            sortOrder=self.SORT_ORDER,
         )
 
     def _query_groups(self, interested_groups: frozenset[str] | None) -> list[models.ContactGroup]:
-        def get() -> Iterable[models.ContactGroup]:
-            groups = self._get_pages(
-                lambda resource: resource.contactGroups(),
-                "contactGroups",
-                pageSize=self.MAX_PAGE_SIZE,
-                groupFields=self.GROUP_FIELDS,
-            )
-
-            for group in groups:
-                member_count = cast("int", group.get("memberCount", 0))
-                if member_count < 1:
-                    continue
+        candidates = self._query_candidate_groups(interested_groups)  # resourceName -> (name, memberCount)
+
+        resource_names = list(candidates)
+
+        results: list[models.ContactGroup] = []
+        for start in range(0, len(resource_names), self.MAX_BATCH_SIZE):
+            batch = resource_names[start : start + self.MAX_BATCH_SIZE]
+
+            def get_request(resource: Resource, batch: list[str] = batch) -> HttpRequest:
+                return resource.contactGroups().batchGet(
+                    resourceNames=batch,
+                    maxMembers=max(candidates[resource_name][1] for resource_name in batch),
+                    groupFields=self.GROUP_FIELDS,
+                    fields=self.GROUP_MEMBERS_RESPONSE_FIELDS,
+                )
+
+            resp = self._execute_with_retry(get_request)
+            for response in resp.get("responses", ()):
+                resource_name = response.get("requestedResourceName")
+                if "contactGroup" not in response or resource_name not in candidates:
+                    # Dropping the group would silently skip its members' messages, so fail the run instead.
+                    msg = f"Group {resource_name} failed to load: {response.get('status')}"
+                    raise RuntimeError(msg)
+
+                name, member_count = candidates[resource_name]
+                members = response["contactGroup"].get("memberResourceNames", [])
+                if len(members) != member_count:
+                    logger.warning(
+                        "Group membership is incomplete", group=name, expected=member_count, found=len(members)
+                    )
+                results.append(models.ContactGroup(name, frozenset(members)))
+
+        return sorted(results, key=lambda x: x.name)
+
+    def _query_candidate_groups(self, interested_groups: frozenset[str] | None) -> dict[str, tuple[str, int]]:
+        groups = self._get_pages(
+            lambda resource: resource.contactGroups(),
+            "contactGroups",
+            pageSize=self.MAX_PAGE_SIZE,
+            groupFields=self.GROUP_FIELDS,
+            fields=self.GROUP_RESPONSE_FIELDS,
+        )
 
-                name = cast("str", group["name"])
-                if name.casefold() in self.BUILT_IN_GROUPS:
-                    continue  # ignore
-                if interested_groups is not None:
-                    if name.casefold() not in interested_groups:
-                        continue  # ignore
+        candidates: dict[str, tuple[str, int]] = {}
+        for group in groups:
+            member_count = cast("int", group.get("memberCount", 0))
+            if member_count < 1:
+                continue
 
-                def get_request(
-                    resource: Resource, group: str = group["resourceName"], member_count: int = member_count
-                ) -> HttpRequest:
-                    return resource.contactGroups().get(resourceName=group, maxMembers=member_count)
+            name = cast("str", group["name"])
+            casefold_name = name.casefold()
+            if casefold_name in self.BUILT_IN_GROUPS:
+                continue  # ignore
+            if interested_groups is not None and casefold_name not in interested_groups:
+                continue  # ignore
 
-                resp = self._execute_with_retry(get_request)
-                members = resp.get("memberResourceNames", [])
-                assert len(members) == member_count
-                yield models.ContactGroup(name, frozenset(members))
+            candidates[group["resourceName"]] = name, member_count
 
-        return sorted(get(), key=lambda x: x.name)
+        return candidates
 
     @staticmethod
     def _is_primary(container: dict[str, Any], field: str = "primary") -> bool:
-        return container.get("metadata", {}).get(field, False)
+        return container.get("metadata", _EMPTY).get(field, False)
 
     @retry(
-        retry=retry_if_exception_cause_type((google.auth.exceptions.RefreshError, HttpError)),
-        wait=wait_exponential(),
+        retry=retry_if_exception_cause_type((google.auth.exceptions.RefreshError, HttpError))
+        | retry_if_exception(_is_throttled),
+        wait=_wait_for_server,
         stop=stop_after_attempt(constants.MAX_RETRY),
     )
     def _execute_with_retry(self, request_factory: Callable[[Resource], HttpRequest]) -> dict[str, Any]:
@@ -231,41 +348,51 @@ class Contacts:
             raise
 
     def _get_pages(self, get_resource: Callable[[Resource], Resource], select_key: str, **kwargs: Any) -> Iterable[Any]:  # noqa: ANN401
-        next_page_token: str | None = None
-        start_idx = 0
-        page_count = 1
-        while True:
+        def fetch(next_page_token: str | None) -> dict[str, Any]:
             request: dict[str, Any] = {"pageToken": next_page_token, **kwargs}
 
-            def get_request(resource: Resource, request: dict[str, Any] = request) -> HttpRequest:
+            def get_request(resource: Resource) -> HttpRequest:
                 return get_resource(resource).list(**request)
 
-            results = self._execute_with_retry(get_request)
-            values = cast("list[dict[str, Any]]", results.get(select_key, []))
+            return self._execute_with_retry(get_request)
+
+        start_idx = 0
+        page_count = 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = fetch(None)
+            while True:
+                # Page tokens are only known once the previous page arrives, so keep a single page in flight
+                # while the caller consumes the current one. The calling thread only waits on that page, so the
+                # worker never shares the (not thread-safe) httplib2 connection with a concurrent request.
+                next_page_token = results.get("nextPageToken")
+                next_page = executor.submit(fetch, next_page_token) if next_page_token else None
 
-            total_len = start_idx + len(values)
-            logger.debug("Page", page=page_count, start=start_idx, length=total_len, key=select_key)
+                values = cast("list[dict[str, Any]]", results.get(select_key, []))
 
-            yield from values
+                total_len = start_idx + len(values)
+                if logger.is_enabled_for(logging.DEBUG):
+                    logger.debug("Page", page=page_count, start=start_idx, length=total_len, key=select_key)
 
-            next_page_token = results.get("nextPageToken")
-            if next_page_token is None:
-                break
+                yield from values
 
-            start_idx = total_len
-            page_count += 1
+                if next_page is None:
+                    break
 
-    def _get_mobile_numbers(self, contact: dict[str, Any]) -> list[models.PhoneNumber]:
+                results = next_page.result()
+                start_idx = total_len
+                page_count += 1
+
+    def _get_mobile_numbers(self, contact: dict[str, Any], display_name: str) -> list[models.PhoneNumber]:
         mobile_numbers: list[models.PhoneNumber] = []
-        for number in contact.get("phoneNumbers", []):
-            if number.get("type", "").casefold() not in (constants.MOBILE_LABEL, constants.BOT_LABEL):
+        for number in contact.get("phoneNumbers", ()):
+            number_type = number.get("type", "").casefold()
+            if number_type not in constants.PHONE_NUMBER_LABELS:
                 continue
 
             primary = self._is_primary(number)
-            is_bot = number.get("type", "").casefold() == constants.BOT_LABEL
+            is_bot = number_type == constants.BOT_LABEL
             contact_number = number.get("canonicalForm")
             if contact_number is None:
-                display_name = cast("tuple[str, str]", self._get_name(contact))[1]
                 logger.warning("No canonical phone number.", contact=display_name)
                 contact_number = number["value"].replace(" ", "")
 
@@ -276,72 +403,75 @@ class Contacts:
     def _get_home_addresses(self, contact: dict[str, Any]) -> list[models.Address]:
         return [
             models.Address(address["postalCode"], self.zipcode.get_timezone(models.Country.US, address["postalCode"]))
-            for address in contact.get("addresses", [])
+            for address in contact.get("addresses", ())
             if address.get("postalCode") and address.get("type", "").casefold() == constants.HOME_LABEL
         ]
 
     def _get_email_addresses(self, contact: dict[str, Any]) -> list[models.EmailAddress]:
         addresses: list[models.EmailAddress] = []
-        for email_addresses in contact.get("emailAddresses", []):
+        for email_addresses in contact.get("emailAddresses", ()):
             email_address_type = email_addresses.get("type", "").casefold()
-            if email_address_type not in (constants.EMAIL_ADDRESS_LABELS):
+            if email_address_type not in constants.EMAIL_ADDRESS_LABELS:
                 continue
 
             primary = self._is_primary(email_addresses)
             address = email_addresses.get("value")
             is_phone = email_address_type in constants.MOBILE_LABELS
-            is_bot = email_address_type in constants.BOT_LABEL
+            is_bot = email_address_type == constants.BOT_LABEL
             addresses.append(models.EmailAddress(address, primary, is_phone, is_bot))
 
         return addresses
 
     def _get_name(self, contact: dict[str, Any]) -> tuple[str, str] | None:
-        if "names" not in contact:
+        names = contact.get("names")
+        if not names:
             return None
 
-        given_name, display_name = next(
-            ((n.get("givenName"), n.get("displayName")) for n in contact["names"]),
-            (None, None),
-        )
+        name = names[0]
+        given_name = name.get("givenName")
+        display_name = name.get("displayName")
 
         if display_name is None:
             return None
 
         if given_name is None:
-            given_name = display_name.split(" ")[0]
+            given_name = display_name.partition(" ")[0]
             logger.warning("Defaulting (no given name)", selected=given_name, contact=display_name)
 
         return given_name.strip(), display_name.strip()
 
     def _get_nickname(self, contact: dict[str, Any]) -> str | None:
-        if "nicknames" not in contact:
-            return None
+        for nickname in contact.get("nicknames", ()):
+            if self._is_primary(nickname):
+                return nickname["value"].strip()
 
-        primary_nicknames = (n["value"].strip() for n in contact.get("nicknames", []) if self._is_primary(n))
-        return next(primary_nicknames, None)
+        return None
 
-    def _convert_date(self, date: dict[str, int]) -> datetime.date:
+    def _convert_date(self, date: dict[str, int], default_year: int) -> datetime.date:
         year = date.get("year")
         if year is None:
-            logger.debug("Year is not present", date=date)
-            year = constants.TODAY.year
+            if logger.is_enabled_for(logging.DEBUG):
+                logger.debug("Year is not present", date=date)
+            year = default_year
 
         return datetime.date(year, date["month"], date["day"])
 
-    def _get_dates(self, contact: dict[str, Any]) -> list[models.DateTuple]:
+    def _get_dates(self, contact: dict[str, Any], default_year: int) -> list[models.DateTuple]:
+        birthdays = contact.get("birthdays")
+        events = contact.get("events")
+        if not birthdays and not events:
+            return []  # most contacts have no dates
+
         results: list[models.DateTuple] = []
+        append = results.append
 
-        results.extend(
-            models.DateTuple(models.DateType.BIRTHDAY, self._convert_date(bd["date"]))
-            for bd in contact.get("birthdays", [])
-            if "date" in bd and self._is_primary(bd)
-        )
+        for bd in birthdays or ():
+            if "date" in bd and self._is_primary(bd):
+                append(models.DateTuple(models.DateType.BIRTHDAY, self._convert_date(bd["date"], default_year)))
 
-        results.extend(
-            models.DateTuple(models.DateType.ANNIVERSARY, self._convert_date(e["date"]))
-            for e in contact.get("events", [])
-            if e["type"] == "anniversary"
-        )
+        for e in events or ():
+            if e.get("type") == "anniversary":
+                append(models.DateTuple(models.DateType.ANNIVERSARY, self._convert_date(e["date"], default_year)))
 
         return results
 
@@ -356,8 +486,8 @@ class Contacts:
         if profile is None and contacts is None:
             return  # Nothing to persist.
 
-        payload: dict[str, Any] = {}
-        if self.cache.exists():
+        payload: dict[str, Any] = {"version": self.CACHE_VERSION}
+        if (profile is None or contacts is None) and self.cache.exists():
             cache_profile, cache_contacts = self._get_cache()
             if profile is None:
                 profile = cache_profile
@@ -374,8 +504,15 @@ class Contacts:
         self._cache = profile, contacts
 
         logger.info("Saving", file=str(self.cache))
-        with self.cache.open(mode="wb") as f:
-            pickle.dump(payload, f)
+        # Write next to the cache and swap it in, so an interrupted save never leaves a truncated cache behind.
+        tmp = self.cache.with_suffix(f"{self.cache.suffix}.tmp")
+        try:
+            with tmp.open(mode="wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(self.cache)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
 
     def _get_cache(self) -> tuple[models.Profile | None, list[models.Contact] | None]:
         if self._cache is not None:
@@ -392,8 +529,10 @@ class Contacts:
             return None, None
 
         logger.info("Loading", file=str(self.cache))
-        with self.cache.open(mode="rb") as f:
-            payload = pickle.load(f)  # noqa: S301
+        payload = pickle.loads(self.cache.read_bytes())  # noqa: S301
+        if payload.get("version") != self.CACHE_VERSION:
+            logger.info("Ignoring stale cache", file=str(self.cache), version=payload.get("version"))
+            return None, None
 
         return payload.get("profile"), payload.get("contacts")
 
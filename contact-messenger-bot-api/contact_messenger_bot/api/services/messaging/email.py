@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import datetime
 import smtplib
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
 from email.mime.text import MIMEText
 from email.utils import formataddr
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Final
 
 import structlog
 
@@ -13,10 +15,14 @@ from contact_messenger_bot.api.models import EmailAddress
 from contact_messenger_bot.api.settings import settings
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from contact_messenger_bot.api.models import Contact, Profile
 
 logger = structlog.get_logger(__name__)
 
+_SMTP_OK: Final[int] = 250
+
 
 def is_supported() -> bool:
     """Determines whether this messaging protocol is supported."""
@@ -43,16 +49,86 @@ def send_message(  # noqa: PLR0913
     _send_message(msg)
 
 
-def _send_message(msg: MIMEText) -> None:
+@contextmanager
+def session() -> Iterator[None]:
+    """Sends the emails within the block over a single SMTP connection, opened on the first message."""
+    if _session.get() is not None:
+        yield  # already within a session
+        return
+
+    smtp_session = _SmtpSession()
+    token = _session.set(smtp_session)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+        smtp_session.close()
+
+
+class _SmtpSession:
+    def __init__(self) -> None:
+        self._smtp: smtplib.SMTP | None = None
+
+    def send(self, msg: MIMEText) -> None:
+        if self._smtp is not None and not _is_alive(self._smtp):
+            logger.debug("Reconnecting")
+            self._smtp.close()
+            self._smtp = None
+
+        if self._smtp is None:
+            self._smtp = _connect()
+
+        try:
+            self._smtp.send_message(msg)
+        except BaseException:
+            # The server may have accepted the message already, so never resend it; just drop the connection.
+            self._smtp.close()
+            self._smtp = None
+            raise
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+
+        with suppress(smtplib.SMTPException, OSError):
+            self._smtp.quit()
+        self._smtp = None
+
+
+_session: ContextVar[_SmtpSession | None] = ContextVar("_session", default=None)
+
+
+def _connect() -> smtplib.SMTP:
     assert settings.email is not None
     logger.debug("Connecting", host=settings.email.host, port=settings.email.port)
-    with smtplib.SMTP(settings.email.host, settings.email.port) as s:
+    s = smtplib.SMTP(settings.email.host, settings.email.port)
+    try:
         if settings.email.auth:
             logger.debug("Authenticating", user=settings.email.auth.user)
             s.starttls()
             s.login(settings.email.auth.user, settings.email.auth.password)
+    except BaseException:
+        s.close()
+        raise
+    return s
+
+
+def _is_alive(smtp: smtplib.SMTP) -> bool:
+    try:
+        status, _ = smtp.noop()
+    except (smtplib.SMTPException, OSError):
+        return False
+    return status == _SMTP_OK
+
+
+def _send_message(msg: MIMEText) -> None:
+    logger.info("Sending email", msg=msg.as_string())
+    smtp_session = _session.get()
+    if smtp_session is not None:
+        smtp_session.send(msg)
+        return
 
-        logger.info("Sending email", msg=msg.as_string())
+    with _connect() as s:
         s.send_message(msg)
 
 
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, TypeAlias
 
 import structlog
 
-from contact_messenger_bot.api import constants, models, utils
+from contact_messenger_bot.api import models, utils
 from contact_messenger_bot.api.services.messaging import email, text
 
 if TYPE_CHECKING:
@@ -42,24 +42,25 @@ class Messaging:
             return
 
         if self.groups:
-            self._filter_contacts(contacts)
+            contacts = self._filter_contacts(contacts)
             if not contacts:
                 logger.info("No contacts found.", groups=self.groups)
                 return
 
-        date = date or constants.TODAY
-        for contact in contacts:
-            self._send_message(self.profile, contact, date, dry_run)
+        date = date or utils.get_today()
+        with email.session():
+            for contact in models.ContactDirectory(contacts).get_contacts_on(date):
+                self._send_message(self.profile, contact, date, dry_run)
 
     def dry_run(self, contacts: Iterable[models.Contact]) -> None:
         if self.groups:
-            self._filter_contacts(contacts)
+            contacts = self._filter_contacts(contacts)
             if not contacts:
                 logger.info("No contacts found.", groups=self.groups)
                 return
 
         for contact in contacts:
-            if contact.opt_out_messages or not contact.dates:
+            if not contact.dates or contact.opt_out_messages:
                 continue
             notifications = [
                 n
@@ -93,15 +94,13 @@ class Messaging:
                 date: datetime.date,
                 dry_run: bool,
             ) -> bool:
+                send_dates = [dt for dt in contact.dates if dt.is_today(date)]
+                assert send_dates, "ContactDirectory only yields contacts with a date on this day"
+
                 if contact.opt_out_messages:
                     logger.debug("Contact has opt-out.", contact=contact)
                     return False  # contact is opt-out
 
-                send_dates = [dt for dt in contact.dates if dt.is_today(date)]
-                if not send_dates:
-                    logger.debug("Contact has no applicable dates.", contact=str(contact), date=date.isoformat())
-                    return False
-
                 logger.info(
                     "Contact has the following events.",
                     contact=str(contact),
@@ -158,13 +157,13 @@ class Messaging:
             return False
 
         logger.debug("Using", email=email_address)
-        for dates in send_dates:
+        for dt in send_dates:
             email.send_message(
                 profile,
                 contact,
                 email_address,
-                dates[0].message(saluation),
-                dates[0].subject(saluation),
+                dt.type.message(saluation),
+                dt.type.subject(saluation),
                 dry_run=dry_run,
             )
 
@@ -187,8 +186,8 @@ class Messaging:
             return False
 
         logger.debug("Using", email=mobile_email_address)
-        for dates in send_dates:
-            email.send_message(profile, contact, mobile_email_address, dates[0].message(saluation), dry_run=dry_run)
+        for dt in send_dates:
+            email.send_message(profile, contact, mobile_email_address, dt.type.message(saluation), dry_run=dry_run)
 
         return True
 
@@ -211,9 +210,9 @@ class Messaging:
             return False
 
         logger.debug("Using", email=all_mobile_email_addresses)
-        for dates in send_dates:
+        for dt in send_dates:
             email.send_message(
-                profile, contact, all_mobile_email_addresses, dates[0].message(saluation), dry_run=dry_run
+                profile, contact, all_mobile_email_addresses, dt.type.message(saluation), dry_run=dry_run
             )
 
         return True
@@ -231,8 +230,8 @@ class Messaging:
             return False
 
         logger.debug("Using", email=us_mobile_number)
-        for dates in send_dates:
-            text.send_message(profile.mobile_number, us_mobile_number, dates[0].message(saluation), dry_run=dry_run)
+        for dt in send_dates:
+            text.send_message(profile.mobile_number, us_mobile_number, dt.type.message(saluation), dry_run=dry_run)
 
         return True
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import contextlib
 import json
+import logging
 from pathlib import Path
 from typing import TYPE_CHECKING, Self
 
@@ -62,7 +63,8 @@ class ZipCode:
         key = (country, zip_code)
         if key in self._cache:
             tz = self._cache[key]
-            logger.debug("Loaded from cache.", tz=tz, zip_code=zip_code)
+            if logger.is_enabled_for(logging.DEBUG):
+                logger.debug("Loaded from cache.", tz=tz, zip_code=zip_code)
             return tz
 
         tz = self._lookup_timezone(country, zip_code)
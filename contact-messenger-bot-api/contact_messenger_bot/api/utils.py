@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-import inspect
+import datetime
 import re
+from functools import lru_cache
 from typing import TYPE_CHECKING, Final
 
 from contact_messenger_bot.api import constants
@@ -12,11 +13,17 @@ if TYPE_CHECKING:
 US_CANOICAL_PHONE_NUMBER: Final[re.Pattern] = re.compile(r"^(?:\+1\s?)?\d{10}$")
 
 
+@lru_cache(maxsize=4096)
 def is_us_phone_number(number: str) -> bool:
     """Determines if a number if a US Canoical Phone Number."""
     return bool(US_CANOICAL_PHONE_NUMBER.match(number))
 
 
+def get_today() -> datetime.date:
+    """Gets the current date (in UTC)."""
+    return datetime.datetime.now(tz=datetime.UTC).date()
+
+
 def to_frozen_set(collection: Iterable[str] | None) -> frozenset[str] | None:
     """Builds a frozenset of the input sequence provided the input sequence has elements."""
     if collection is None:
@@ -25,14 +32,6 @@ def to_frozen_set(collection: Iterable[str] | None) -> frozenset[str] | None:
     return result if result else None
 
 
-def get_all_subclasses(class_type: type) -> Iterable[type]:
-    """Gets all the subclasses of the specified type."""
-    for subclass in class_type.__subclasses__():
-        if not inspect.isabstract(subclass):
-            yield subclass
-        yield from get_all_subclasses(subclass)
-
-
 def is_truthy(value: str | None, default: bool = False) -> bool:
     """
     Determines if the value is considered True.
@@ -61,4 +60,4 @@ def is_truthy(value: str | None, default: bool = False) -> bool:
     """
     if value is None:
         return default
-    return value.casefold() in constants.TRUTHY
+    return value in constants.TRUTHY or value.casefold() in constants.TRUTHY
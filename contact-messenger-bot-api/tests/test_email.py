@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import smtplib
+from email.mime.text import MIMEText
+from typing import TYPE_CHECKING, Self
+
+import pytest
+
+from contact_messenger_bot.api.services.messaging.email import _send_message, session
+from contact_messenger_bot.api.settings import settings
+from contact_messenger_bot.api.settings.email import EmailSettings
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+class FakeSMTP:
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.sent: list[str] = []
+        self.connected = True
+        self.fail_send = False
+        self.quit_called = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        self.quit()
+
+    def noop(self) -> tuple[int, bytes]:
+        if not self.connected:
+            raise smtplib.SMTPServerDisconnected
+        return 250, b"OK"
+
+    def send_message(self, msg: MIMEText) -> None:
+        if not self.connected or self.fail_send:
+            raise smtplib.SMTPServerDisconnected
+        self.sent.append(msg["Subject"])
+
+    def quit(self) -> None:
+        self.quit_called = True
+        self.close()
+
+    def close(self) -> None:
+        self.connected = False
+
+
+@pytest.fixture
+def connections(monkeypatch: pytest.MonkeyPatch) -> list[FakeSMTP]:
+    created: list[FakeSMTP] = []
+
+    def connect(host: str, port: int) -> FakeSMTP:
+        smtp = FakeSMTP(host, port)
+        created.append(smtp)
+        return smtp
+
+    monkeypatch.setattr(smtplib, "SMTP", connect)
+    monkeypatch.setattr(settings, "email", EmailSettings(host="localhost", port=25))
+    return created
+
+
+def _message(subject: str) -> MIMEText:
+    msg = MIMEText("body")
+    msg["Subject"] = subject
+    return msg
+
+
+def test_session_reuses_connection(connections: list[FakeSMTP]) -> None:
+    with session():
+        _send_message(_message("a"))
+        _send_message(_message("b"))
+
+    assert [c.sent for c in connections] == [["a", "b"]]
+    assert connections[0].quit_called
+
+
+def test_session_connects_lazily(connections: list[FakeSMTP]) -> None:
+    with session():
+        pass
+
+    assert connections == []
+
+
+def test_session_reconnects_when_connection_dropped(connections: list[FakeSMTP]) -> None:
+    with session():
+        _send_message(_message("a"))
+        connections[0].close()
+        _send_message(_message("b"))
+
+    assert [c.sent for c in connections] == [["a"], ["b"]]
+
+
+def test_session_does_not_resend_after_failure(connections: list[FakeSMTP]) -> None:
+    with session():
+        _send_message(_message("a"))
+        connections[0].fail_send = True
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            _send_message(_message("b"))
+        _send_message(_message("c"))
+
+    assert [c.sent for c in connections] == [["a"], ["c"]]
+
+
+def test_without_session_connects_per_message(connections: list[FakeSMTP]) -> None:
+    _send_message(_message("a"))
+    _send_message(_message("b"))
+
+    assert [c.sent for c in connections] == [["a"], ["b"]]
+    assert all(c.quit_called for c in connections)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 import datetime
 import json
 from contextlib import contextmanager
@@ -7,8 +8,7 @@ from typing import TYPE_CHECKING
 
 import asyncclick as click
 import structlog
-from contact_messenger_bot.api import constants as api_constants
-from contact_messenger_bot.api import oauth2, services
+from contact_messenger_bot.api import oauth2, services, utils
 
 from contact_messenger_bot.cli.commands import constants
 from contact_messenger_bot.cli.commands.common import cli
@@ -61,7 +61,7 @@ def contact_service(
 @click.option(
     "--today",
     type=str,
-    default=api_constants.TODAY.strftime(constants.DATE_FMT),
+    default=lambda: utils.get_today().strftime(constants.DATE_FMT),
     help="Todays's date",
 )
 @click.option(
@@ -160,7 +160,9 @@ async def list_contacts(  # noqa: PLR0913
         contact_lst = contact_svc.get_contacts(load_cache=load_cache, save_cache=save_cache)
 
         for contact in contact_lst:
-            logger.info("contact", contact=json.loads(json.dumps(contact, sort_keys=True, default=str)))
+            logger.info(
+                "contact", contact=json.loads(json.dumps(dataclasses.asdict(contact), sort_keys=True, default=str))
+            )
 
 
 @cli.command("supported-protocols")
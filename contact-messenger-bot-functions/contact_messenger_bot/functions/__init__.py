@@ -2,12 +2,20 @@ from __future__ import annotations
 
 import importlib.metadata
 
-# set the version number within the package using importlib
-try:
-    __version__: str | None = importlib.metadata.version("contact-messenger-bot-functions")
-except importlib.metadata.PackageNotFoundError:
-    # package is not installed
-    __version__ = None
+
+def __getattr__(name: str) -> str | None:
+    if name == "__version__":
+        # set the version number within the package using importlib (deferred until first accessed)
+        try:
+            version: str | None = importlib.metadata.version("contact-messenger-bot-functions")
+        except importlib.metadata.PackageNotFoundError:
+            # package is not installed
+            version = None
+        globals()["__version__"] = version
+        return version
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
 
 
 __all__ = ["__version__"]
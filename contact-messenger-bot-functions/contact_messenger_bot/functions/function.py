@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 import datetime
 import json
 from contextlib import contextmanager
@@ -81,7 +82,9 @@ def get_contacts(request: flask.Request, credentials_file: Path, token_file: Pat
         contact_lst = contact_svc.get_contacts(load_cache=load_cache, save_cache=save_cache)
 
         for contact in contact_lst:
-            logger.info("contact", contact=json.loads(json.dumps(contact, sort_keys=True, default=str)))
+            logger.info(
+                "contact", contact=json.loads(json.dumps(dataclasses.asdict(contact), sort_keys=True, default=str))
+            )
 
         return flask.make_response("", HTTPStatus.NO_CONTENT)
 